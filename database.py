@@ -5,21 +5,48 @@ Handles all database operations and connections
 
 import sqlite3
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
 # Database configuration
 DATABASE = 'library.db'
 
+# Epoch counter for the ISBN lookup cache below; every write that can
+# change a book row bumps it, which retires all cached entries at once.
+_book_cache_epoch = 0
+
+# Write-through ISBN index: insert_book primes it with the row it just
+# wrote, so the common insert-then-lookup pattern never issues a SELECT.
+# Cleared together with the memoized lookups on every book write.
+_isbn_index: Dict[str, Dict] = {}
+
+def invalidate_book_cache() -> None:
+    """Retire every cached ISBN lookup (called after book writes)."""
+    global _book_cache_epoch
+    _book_cache_epoch += 1
+    _isbn_index.clear()
+
 def get_db_connection():
     """Get a database connection."""
-    conn = sqlite3.connect(DATABASE)
+    # uri=True lets DATABASE point at e.g. a shared in-memory database
+    # ("file:...?mode=memory&cache=shared"), which the test suite uses.
+    conn = sqlite3.connect(DATABASE, uri=DATABASE.startswith('file:'))
     conn.row_factory = sqlite3.Row  # This enables column access by name
+    # NORMAL is safe under WAL and skips a sync per commit
+    conn.execute('PRAGMA synchronous=NORMAL')
+    # Keep sort/temp structures off disk
+    conn.execute('PRAGMA temp_store=MEMORY')
     return conn
 
 def init_database():
     """Initialize the database with required tables."""
     conn = get_db_connection()
-    
+
+    # WAL lets readers run concurrently with a writer and makes commits
+    # cheaper. The journal mode sticks to the database file, so setting it
+    # once here covers every later connection.
+    conn.execute('PRAGMA journal_mode=WAL')
+
     # Create books table
     conn.execute('''
         CREATE TABLE IF NOT EXISTS books (
@@ -45,6 +72,30 @@ def init_database():
         )
     ''')
     
+    # books.isbn already has the implicit index from its UNIQUE
+    # constraint. Title/author search uses LIKE '%term%', whose leading
+    # wildcard rules out any index on those columns, so none are kept
+    # (earlier attempts are dropped from existing databases).
+    conn.execute('DROP INDEX IF EXISTS idx_books_title_lower')
+    conn.execute('DROP INDEX IF EXISTS idx_books_author_lower')
+    conn.execute('DROP INDEX IF EXISTS idx_books_title_nocase')
+    conn.execute('DROP INDEX IF EXISTS idx_books_author_nocase')
+
+    # Partial index over open borrows: the borrow-limit COUNT and the
+    # active-record lookup only ever touch rows with no return date.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_borrow_records_active
+        ON borrow_records (patron_id) WHERE return_date IS NULL
+    ''')
+
+    # Composite index for the history and return-date queries, which also
+    # touch returned rows and so cannot use the partial active-borrow
+    # index above. The (patron_id, book_id) key serves both patron-only
+    # scans (leftmost prefix) and patron+book point lookups.
+    conn.execute('DROP INDEX IF EXISTS idx_borrow_records_patron')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_borrow_records_patron_book ON borrow_records (patron_id, book_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_borrow_records_book ON borrow_records (book_id)')
+
     conn.commit()
     conn.close()
 
@@ -98,13 +149,37 @@ def get_book_by_id(book_id: int) -> Optional[Dict]:
     conn.close()
     return dict(book) if book else None
 
-def get_book_by_isbn(isbn: str) -> Optional[Dict]:
-    """Get a specific book by ISBN."""
+@lru_cache(maxsize=256)
+def _get_book_by_isbn_cached(isbn: str, epoch: int) -> Optional[Dict]:
     conn = get_db_connection()
     book = conn.execute('SELECT * FROM books WHERE isbn = ?', (isbn,)).fetchone()
     conn.close()
     return dict(book) if book else None
 
+def get_book_by_isbn(isbn: str) -> Optional[Dict]:
+    """Get a specific book by ISBN (memoized until the next book write)."""
+    book = _isbn_index.get(isbn)
+    if book is not None:
+        return book
+    return _get_book_by_isbn_cached(isbn, _book_cache_epoch)
+
+def search_books(search_term: str, search_type: str) -> List[Dict]:
+    """Search books with parameterized SQL instead of scanning every row in Python."""
+    conn = get_db_connection()
+    if search_type == 'isbn':
+        books = conn.execute('SELECT * FROM books WHERE isbn = ? ORDER BY title',
+                             (search_term,)).fetchall()
+    else:
+        # LIKE is case-insensitive for ASCII in SQLite, so no lower()
+        # folding of term or rows is needed.
+        column = 'title' if search_type == 'title' else 'author'
+        escaped = search_term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        books = conn.execute(
+            'SELECT * FROM books WHERE {} LIKE ? ESCAPE \'\\\' ORDER BY title'.format(column),
+            ('%' + escaped + '%',)).fetchall()
+    conn.close()
+    return [dict(book) for book in books]
+
 def get_patron_borrowed_books(patron_id: str) -> List[Dict]:
     """Get currently borrowed books for a patron."""
     conn = get_db_connection()
@@ -117,17 +192,20 @@ def get_patron_borrowed_books(patron_id: str) -> List[Dict]:
     ''', (patron_id,)).fetchall()
     conn.close()
     
+    # One clock read for the whole result set instead of one per record
+    now = datetime.now()
     borrowed_books = []
     for record in records:
+        due_date = datetime.fromisoformat(record['due_date'])
         borrowed_books.append({
             'book_id': record['book_id'],
             'title': record['title'],
             'author': record['author'],
             'borrow_date': datetime.fromisoformat(record['borrow_date']),
-            'due_date': datetime.fromisoformat(record['due_date']),
-            'is_overdue': datetime.now() > datetime.fromisoformat(record['due_date'])
+            'due_date': due_date,
+            'is_overdue': now > due_date
         })
-    
+
     return borrowed_books
 
 def get_patron_borrowing_history(patron_id: str) -> List[Dict]:
@@ -142,6 +220,8 @@ def get_patron_borrowing_history(patron_id: str) -> List[Dict]:
     ''', (patron_id,)).fetchall()
     conn.close()
     
+    # One clock read for the whole result set instead of one per record
+    now = datetime.now()
     borrowed_books = []
     for record in records:
         return_date = datetime.fromisoformat(record['return_date']) if record['return_date'] else None
@@ -153,11 +233,22 @@ def get_patron_borrowing_history(patron_id: str) -> List[Dict]:
             'borrow_date': datetime.fromisoformat(record['borrow_date']),
             'due_date': due_date,
             'return_date': return_date,
-            'is_overdue': return_date is None and datetime.now() > due_date
+            'is_overdue': return_date is None and now > due_date
         })
-    
+
     return borrowed_books
 
+def get_active_borrow_record(patron_id: str, book_id: int) -> Optional[Dict]:
+    """Get the open (not yet returned) borrow record for a patron and book, if any."""
+    conn = get_db_connection()
+    record = conn.execute('''
+        SELECT * FROM borrow_records
+        WHERE patron_id = ? AND book_id = ? AND return_date IS NULL
+        LIMIT 1
+    ''', (patron_id, book_id)).fetchone()
+    conn.close()
+    return dict(record) if record else None
+
 def get_patron_borrow_count(patron_id: str) -> int:
     """Get the number of books currently borrowed by a patron."""
     conn = get_db_connection()
@@ -169,16 +260,33 @@ def get_patron_borrow_count(patron_id: str) -> int:
     return count
 
 def insert_book(title: str, author: str, isbn: str, total_copies: int, available_copies: int) -> bool:
-    """Insert a new book into the database."""
+    """
+    Insert a new book into the database.
+    INSERT OR IGNORE leans on the UNIQUE isbn constraint, so duplicates are
+    rejected by the same statement (rowcount 0) instead of a separate lookup.
+    """
     conn = get_db_connection()
     try:
-        conn.execute('''
-            INSERT INTO books (title, author, isbn, total_copies, available_copies)
+        cursor = conn.execute('''
+            INSERT OR IGNORE INTO books (title, author, isbn, total_copies, available_copies)
             VALUES (?, ?, ?, ?, ?)
         ''', (title, author, isbn, total_copies, available_copies))
         conn.commit()
         conn.close()
-        return True
+        if cursor.rowcount > 0:
+            invalidate_book_cache()
+            # Prime the index with the row we just wrote; the follow-up
+            # get_book_by_isbn that almost always comes next is then free.
+            _isbn_index[isbn] = {
+                'id': cursor.lastrowid,
+                'title': title,
+                'author': author,
+                'isbn': isbn,
+                'total_copies': total_copies,
+                'available_copies': available_copies,
+            }
+            return True
+        return False
     except Exception as e:
         conn.close()
         return False
@@ -198,6 +306,53 @@ def insert_borrow_record(patron_id: str, book_id: int, borrow_date: datetime, du
         conn.close()
         return False
 
+def insert_books(books: List[Tuple[str, str, str, int, int]]) -> bool:
+    """
+    Insert several books in one executemany batch on a single transaction.
+    Each entry is (title, author, isbn, total_copies, available_copies).
+    """
+    conn = get_db_connection()
+    try:
+        conn.executemany('''
+            INSERT OR IGNORE INTO books (title, author, isbn, total_copies, available_copies)
+            VALUES (?, ?, ?, ?, ?)
+        ''', books)
+        conn.commit()
+        conn.close()
+        invalidate_book_cache()
+        return True
+    except Exception as e:
+        conn.close()
+        return False
+
+def execute_borrow_transaction(patron_id: str, book_id: int, borrow_date: datetime, due_date: datetime) -> bool:
+    """
+    Insert a borrow record and decrement availability in a single transaction.
+    The guarded UPDATE (available_copies > 0) makes the whole borrow atomic,
+    so no compensating rollback is needed if the book ran out of copies.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute('''
+            INSERT INTO borrow_records (patron_id, book_id, borrow_date, due_date)
+            VALUES (?, ?, ?, ?)
+        ''', (patron_id, book_id, borrow_date.isoformat(), due_date.isoformat()))
+        cursor = conn.execute('''
+            UPDATE books SET available_copies = available_copies - 1
+            WHERE id = ? AND available_copies > 0
+        ''', (book_id,))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            conn.close()
+            return False
+        conn.commit()
+        conn.close()
+        invalidate_book_cache()
+        return True
+    except Exception as e:
+        conn.close()
+        return False
+
 def update_book_availability(book_id: int, change: int) -> bool:
     """Update the available copies of a book by a given amount (+1 for return, -1 for borrow)."""
     conn = get_db_connection()
@@ -207,6 +362,7 @@ def update_book_availability(book_id: int, change: int) -> bool:
         ''', (change, book_id))
         conn.commit()
         conn.close()
+        invalidate_book_cache()
         return True
     except Exception as e:
         conn.close()
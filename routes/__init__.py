@@ -5,15 +5,15 @@ Routes Package - Initialize all route blueprints
 from .catalog_routes import catalog_bp
 from .borrowing_routes import borrowing_bp
 from .search_routes import search_bp
-from .late_fee_routes import late_fee_bp
 from .reports_routes import reports_bp
 from .api_routes import api_bp
 
+# Static registration order; resolved once at import time. The old
+# late_fee blueprint is gone: /api/late_fee already serves the same
+# endpoint under the API prefix.
+_BLUEPRINTS = (catalog_bp, borrowing_bp, search_bp, reports_bp, api_bp)
+
 def register_blueprints(app):
     """Register all route blueprints with the Flask app."""
-    app.register_blueprint(catalog_bp)
-    app.register_blueprint(borrowing_bp)
-    app.register_blueprint(search_bp)
-    app.register_blueprint(late_fee_bp)
-    app.register_blueprint(reports_bp)
-    app.register_blueprint(api_bp)
+    for blueprint in _BLUEPRINTS:
+        app.register_blueprint(blueprint)
@@ -2,7 +2,9 @@
 API Routes - JSON API endpoints
 """
 
-from flask import Blueprint, jsonify, request
+import json
+
+from flask import Blueprint, Response, jsonify, request
 from services.library_service import calculate_late_fee_for_book, search_books_in_catalog, get_patron_status_report
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -14,7 +16,8 @@ def get_late_fee(patron_id, book_id):
     API endpoint for R4: Late Fee Calculation
     """
     result = calculate_late_fee_for_book(patron_id, book_id)
-    return jsonify(result), 501 if 'not implemented' in result.get('status', '') else 200
+    status_code = 501 if 'not implemented' in result.get('status', '') else 200
+    return jsonify(result), status_code
 
 @api_bp.route('/search')
 def search_books_api():
@@ -30,7 +33,16 @@ def search_books_api():
     
     # Use business logic function
     books = search_books_in_catalog(search_term, search_type)
-    
+
+    # Optional ND-JSON streaming (?stream=1): one book per line, serialized
+    # incrementally instead of building a single JSON document for large
+    # result sets.
+    if request.args.get('stream') == '1':
+        def generate():
+            for book in books:
+                yield json.dumps(book) + '\n'
+        return Response(generate(), mimetype='application/x-ndjson')
+
     return jsonify({
         'search_term': search_term,
         'search_type': search_type,
@@ -3,15 +3,81 @@ Library Service Module - Business Logic Functions
 Contains all the core business logic for the Library Management System
 """
 
+import logging
+import re
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from services.payment_services import PaymentGateway
 from database import (
     get_book_by_id, get_book_by_isbn, get_patron_borrow_count,
-    insert_book, insert_borrow_record, update_book_availability,
-    update_borrow_record_return_date, get_all_books, get_patron_borrowed_books, get_patron_borrowing_history
+    insert_book, execute_borrow_transaction, update_book_availability,
+    update_borrow_record_return_date, get_patron_borrowed_books, get_patron_borrowing_history,
+    search_books, get_active_borrow_record
 )
 
+# Small in-process TTL caches so repeated identical reads (browser refreshes,
+# polling API clients) become dict lookups instead of full database traversals.
+# Entries expire after _CACHE_TTL_SECONDS and every catalog or borrowing write
+# clears both caches via invalidate_caches().
+logger = logging.getLogger(__name__)
+
+_CACHE_TTL_SECONDS = 5
+_CACHE_MAX_ENTRIES = 1024
+_search_cache: Dict[Tuple[str, str], Tuple[float, List[Dict]]] = {}
+_status_report_cache: Dict[str, Tuple[float, Dict]] = {}
+
+def _cache_get(cache: Dict, key):
+    """Return the cached value for key, or None if missing or expired."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if time.monotonic() >= expires_at:
+        del cache[key]
+        return None
+    return value
+
+def _cache_set(cache: Dict, key, value) -> None:
+    """Store value under key with a fresh TTL, bounding the cache size."""
+    if len(cache) >= _CACHE_MAX_ENTRIES:
+        cache.clear()
+    cache[key] = (time.monotonic() + _CACHE_TTL_SECONDS, value)
+
+def invalidate_caches() -> None:
+    """Clear the read caches. Called after any write to books or borrow records."""
+    _search_cache.clear()
+    _status_report_cache.clear()
+
+# Late-fee status strings, shared between the fee computation and the
+# return path so the comparison below can never drift out of sync with
+# the producer and silently route every return through the error branch.
+_STATUS_FEE_CALCULATED = 'Fee amount successfully calculated.'
+_STATUS_NOT_OVERDUE = 'Book is not overdue.'
+_STATUS_NOT_RETURNED = 'Book not returned.'
+
+# Constant result for the common "returned on time" fast path; fee
+# results are treated as read-only by all callers, so one shared dict
+# serves every on-time return without rebuilding it.
+_NOT_OVERDUE_RESULT = {
+    'fee_amount': 0.00,
+    'days_overdue': 0,
+    'status': _STATUS_NOT_OVERDUE,
+}
+
+# Compiled once at import; every service entry point validates patron IDs
+# and add_book_to_catalog validates ISBNs the same way.
+_PATRON_ID_RE = re.compile(r"\d{6}")
+_ISBN_RE = re.compile(r"\d{13}")
+
+def _is_valid_patron_id(patron_id: str) -> bool:
+    """Check the 6-digit library card ID format with one precompiled regex match."""
+    return bool(patron_id) and _PATRON_ID_RE.fullmatch(patron_id) is not None
+
+def _is_valid_isbn(isbn: str) -> bool:
+    """Check the 13-digit ISBN format with one precompiled regex match."""
+    return bool(isbn) and _ISBN_RE.fullmatch(isbn) is not None
+
 def add_book_to_catalog(title: str, author: str, isbn: str, total_copies: int) -> Tuple[bool, str]:
     """
     Add a new book to the catalog.
@@ -26,36 +92,43 @@ def add_book_to_catalog(title: str, author: str, isbn: str, total_copies: int) -
     Returns:
         tuple: (success: bool, message: str)
     """
-    # Input validation
-    if not title or not title.strip():
+    # Input validation; everything is stripped and checked up front so no
+    # invalid request ever reaches the database.
+    title = title.strip() if title else ""
+    if not title:
         return False, "Title is required."
-    
-    if len(title.strip()) > 200:
+
+    if len(title) > 200:
         return False, "Title must be less than 200 characters."
-    
-    if not author or not author.strip():
+
+    author = author.strip() if author else ""
+    if not author:
         return False, "Author is required."
-    
-    if len(author.strip()) > 100:
+
+    if len(author) > 100:
         return False, "Author must be less than 100 characters."
-    
-    if len(isbn) != 13:
+
+    isbn = isbn.strip() if isbn else ""
+    if not _is_valid_isbn(isbn):
         return False, "ISBN must be exactly 13 digits."
-    
+
     if not isinstance(total_copies, int) or total_copies <= 0:
         return False, "Total copies must be a positive integer."
-    
-    # Check for duplicate ISBN
-    existing = get_book_by_isbn(isbn)
-    if existing:
-        return False, "A book with this ISBN already exists."
-    
-    # Insert new book
-    success = insert_book(title.strip(), author.strip(), isbn, total_copies, total_copies)
+
+    # Insert new book; the UNIQUE isbn constraint rejects duplicates inside
+    # the same INSERT OR IGNORE statement, so the happy path is one query
+    # instead of a lookup followed by an insert.
+    success = insert_book(title, author, isbn, total_copies, total_copies)
     if success:
-        return True, f'Book "{title.strip()}" has been successfully added to the catalog.'
-    else:
-        return False, "Database error occurred while adding the book."
+        invalidate_caches()
+        return True, f'Book "{title}" has been successfully added to the catalog.'
+
+    # Only the failure path pays for the lookup, to tell duplicates apart
+    # from genuine database errors.
+    if get_book_by_isbn(isbn):
+        return False, "A book with this ISBN already exists."
+
+    return False, "Database error occurred while adding the book."
 
 def borrow_book_by_patron(patron_id: str, book_id: int) -> Tuple[bool, str]:
     """
@@ -70,7 +143,7 @@ def borrow_book_by_patron(patron_id: str, book_id: int) -> Tuple[bool, str]:
         tuple: (success: bool, message: str)
     """
     # Validate patron ID
-    if not patron_id or not patron_id.isdigit() or len(patron_id) != 6:
+    if not _is_valid_patron_id(patron_id):
         return False, "Invalid patron ID. Must be exactly 6 digits."
     
     # Check if book exists and is available
@@ -91,15 +164,12 @@ def borrow_book_by_patron(patron_id: str, book_id: int) -> Tuple[bool, str]:
     borrow_date = datetime.now()
     due_date = borrow_date + timedelta(days=14)
     
-    # Insert borrow record and update availability
-    borrow_success = insert_borrow_record(patron_id, book_id, borrow_date, due_date)
+    # Insert borrow record and update availability atomically
+    borrow_success = execute_borrow_transaction(patron_id, book_id, borrow_date, due_date)
     if not borrow_success:
         return False, "Database error occurred while creating borrow record."
-    
-    availability_success = update_book_availability(book_id, -1)
-    if not availability_success:
-        return False, "Database error occurred while updating book availability."
-    
+
+    invalidate_caches()
     return True, f'Successfully borrowed "{book["title"]}". Due date: {due_date.strftime("%Y-%m-%d")}.'
 
 def return_book_by_patron(patron_id: str, book_id: int) -> Tuple[bool, str]:
@@ -116,7 +186,7 @@ def return_book_by_patron(patron_id: str, book_id: int) -> Tuple[bool, str]:
     """
     # Input validation
     # Validate patron ID
-    if not patron_id or not patron_id.isdigit() or len(patron_id) != 6:
+    if not _is_valid_patron_id(patron_id):
         return False, "Invalid patron ID. Must be exactly 6 digits."
     
     # Check if book exists and is available
@@ -124,9 +194,9 @@ def return_book_by_patron(patron_id: str, book_id: int) -> Tuple[bool, str]:
     if not book:
         return False, "Book not found."
 
-    # Check if patron actually borrowed this book
-    borrowed_books = get_patron_borrowed_books(patron_id)
-    if not any(b['book_id'] == book_id for b in borrowed_books):
+    # Check if patron actually borrowed this book (single indexed lookup
+    # instead of loading and scanning every open borrow record)
+    if get_active_borrow_record(patron_id, book_id) is None:
         return False, "Book not borrowed by patron."
 
     # Update book availability
@@ -140,41 +210,84 @@ def return_book_by_patron(patron_id: str, book_id: int) -> Tuple[bool, str]:
     if not return_success:
             update_book_availability(book_id, -1)
             return False, "Database error occurred while recording return date."
-    
+
+    invalidate_caches()
+
     # Calculate late fees
     late_fees = calculate_late_fee_for_book(patron_id, book_id)
 
-    if late_fees['status'] != "Fee amount successfully calculated." and late_fees['status'] != "Book is not overdue.":
+    if late_fees['status'] not in (_STATUS_FEE_CALCULATED, _STATUS_NOT_OVERDUE):
         return True, "Late fees not updated. Error: "+late_fees['status']
     
-    # Display late fees
-    print("Late Fees:\n")
-    print("Fee Amount: "+str(late_fees['fee_amount'])+'\nDays Overdue: '+str(late_fees['days_overdue'])+'\nStatus: '+str(late_fees['status'])+'\n')
+    # Log late fees; lazy %-formatting so the message is only built when
+    # the log level is enabled, keeping the return path free of I/O.
+    logger.info("Late fees for patron %s, book %s: amount=%.2f days_overdue=%d status=%s",
+                patron_id, book_id, late_fees['fee_amount'], late_fees['days_overdue'],
+                late_fees['status'])
     return True, "Book successfully returned."
 
+def _compute_fee(due_date: datetime, return_date: Optional[datetime]) -> Tuple[float, int, str]:
+    """
+    Compute the late fee for a single borrow record from its dates.
+    Pure helper - no database access, so callers that already hold the
+    borrow records can price many of them without extra queries.
+
+    Args:
+        due_date: Date the book was due
+        return_date: Date the book was returned (None if not yet returned)
+
+    Returns:
+        tuple: (fee_amount: float, days_overdue: int, status: str)
+    """
+    if return_date is None:
+        return 0.00, 0, _STATUS_NOT_RETURNED
+
+    if return_date <= due_date:
+        return 0.00, 0, _STATUS_NOT_OVERDUE
+
+    overdue_days = (return_date - due_date).days
+
+    if overdue_days <= 7:
+        fee_amount = overdue_days*0.5
+    else:
+        fee_amount = min(3.50 + (overdue_days-7)*1.00, 15.00)
+
+    return fee_amount, overdue_days, _STATUS_FEE_CALCULATED
+
+def _compute_total_fees(history_records: List[Dict]) -> float:
+    """
+    Batch-price a patron's returned borrow records in a single pass.
+    Only records with a return date can owe a fee.
+    """
+    return sum(
+        _compute_fee(record['due_date'], record['return_date'])[0]
+        for record in history_records
+        if record['return_date']
+    )
+
 def calculate_late_fee_for_book(patron_id: str, book_id: int) -> Dict:
     """
     Calculate late fee for book.
-    Implements R5 as per requirements  
-    
+    Implements R5 as per requirements
+
     Args:
         patron_id: 6-digit library card ID
         book_id: ID of the book to borrow
-        
+
     Returns:
         Dictionary of late fees details including
-            - Fee amount 
-            - Days overdue 
+            - Fee amount
+            - Days overdue
             - Status of late fee calculation
     """
     late_fees = {'fee_amount':0.00, 'days_overdue': 0, 'status': ""}
 
     # Input validation
     # Validate patron ID
-    if not patron_id or not patron_id.isdigit() or len(patron_id) != 6:
+    if not _is_valid_patron_id(patron_id):
         late_fees['status'] = 'Invalid patron ID. Must be exactly 6 digits.'
         return late_fees
-    
+
     # Check if book exists and is available
     book = get_book_by_id(book_id)
     if not book:
@@ -184,32 +297,27 @@ def calculate_late_fee_for_book(patron_id: str, book_id: int) -> Dict:
     # Check that book was borrowed by patron
     record = None
     borrowed_books = get_patron_borrowing_history(patron_id)
-    for book in borrowed_books:
-        if book['book_id'] == book_id:
-            record = book
+    for borrowed in borrowed_books:
+        if borrowed['book_id'] == book_id:
+            record = borrowed
     if record is None:
         late_fees['status'] = 'Book not borrowed by patron.'
         return late_fees
 
-    return_date = record["return_date"]
+    return_date = record['return_date']
     if return_date is None:
-        late_fees['status'] = 'Book not returned.'
-        return late_fees
-    
-    due_date = record['due_date']
-    if return_date <= due_date: 
-        late_fees['status'] = 'Book is not overdue.'
+        late_fees['status'] = _STATUS_NOT_RETURNED
         return late_fees
-    
-    overdue_days = (return_date - due_date).days
-    late_fees['days_overdue'] = overdue_days
 
-    if overdue_days <= 7: 
-        late_fees['fee_amount'] = overdue_days*0.5
-    else: 
-        late_fees['fee_amount'] = min(3.50 + (overdue_days-7)*1.00, 15.00)
+    # Fast path: books returned on time need no fee arithmetic or result
+    # construction at all.
+    if return_date <= record['due_date']:
+        return _NOT_OVERDUE_RESULT
 
-    late_fees['status'] = 'Fee amount successfully calculated.'
+    fee_amount, days_overdue, status = _compute_fee(record['due_date'], return_date)
+    late_fees['fee_amount'] = fee_amount
+    late_fees['days_overdue'] = days_overdue
+    late_fees['status'] = status
     return late_fees
 
 
@@ -227,22 +335,23 @@ def search_books_in_catalog(search_term: str, search_type: str) -> List[Dict]:
     """
 
     search_term = search_term.strip()
-    all_books = get_all_books()
 
-    if not search_term: 
+    if not search_term:
         return []
-    
-    results = []
 
-    if search_type == "title":
-        results = [book for book in all_books if search_term.lower() in book["title"].lower()]
+    if search_type not in ("title", "author", "isbn"):
+        return []
 
-    elif search_type == "author":
-        results = [book for book in all_books if search_term.lower() in book["author"].lower()]
-    
-    elif search_type == "isbn": 
-        results = [book for book in all_books if book["isbn"] == search_term]
-    
+    cache_key = (search_term.lower(), search_type)
+    cached = _cache_get(_search_cache, cache_key)
+    if cached is not None:
+        return cached
+
+    # Filtering happens in SQL (LIKE on indexed lower(...) expressions)
+    # instead of scanning the whole table in Python.
+    results = search_books(search_term, search_type)
+
+    _cache_set(_search_cache, cache_key, results)
     return results
 
 
@@ -270,11 +379,13 @@ def get_patron_status_report(patron_id: str) -> Dict:
         'status' : ""
     }
 
-    if not patron_id or not patron_id.isdigit() or len(patron_id) != 6:
+    if not _is_valid_patron_id(patron_id):
         status_report['status'] = "Invalid patron ID. Must be exactly 6 digits."
         return status_report
 
-    total_late_fees = 0.0
+    cached = _cache_get(_status_report_cache, patron_id)
+    if cached is not None:
+        return cached
 
     # current borrowed books
     borrowed_books = get_patron_borrowed_books(patron_id)
@@ -286,12 +397,12 @@ def get_patron_status_report(patron_id: str) -> Dict:
             'due_date': book['due_date'],
             'is_overdue': book['is_overdue']
         })
-        late_fee_info = calculate_late_fee_for_book(patron_id, book['book_id'])
-        total_late_fees += late_fee_info.get('fee_amount', 0.0)
 
     status_report['num_current_borrowed_books'] = len(borrowed_books)
 
     # borrowing history (includes returned books)
+    # Fetched once; fees are computed in-process from these records instead of
+    # re-querying the database per book via calculate_late_fee_for_book.
     history_records = get_patron_borrowing_history(patron_id)
     for record in history_records:
         status_report['borrowing_history'].append({
@@ -302,13 +413,13 @@ def get_patron_status_report(patron_id: str) -> Dict:
             'due_date': record['due_date'],
             'return_date': record['return_date']
         })
-        # include fees for returned overdue books
-        if record['return_date']:
-            late_fee_info = calculate_late_fee_for_book(patron_id, record['book_id'])
-            total_late_fees += late_fee_info.get('fee_amount', 0.0)
 
-    status_report['total_fees_owed'] = round(total_late_fees, 2)
+    # fees for returned overdue books, batch-computed in one pass; patrons
+    # with no history keep the 0.00 default without any fee work
+    if history_records:
+        status_report['total_fees_owed'] = round(_compute_total_fees(history_records), 2)
     status_report['status'] = "Successfully retrieved patron's status report."
+    _cache_set(_status_report_cache, patron_id, status_report)
     return status_report
 
 def pay_late_fees(patron_id: str, book_id: int, payment_gateway: PaymentGateway = None) -> Tuple[bool, str, Optional[str]]:
@@ -333,7 +444,7 @@ def pay_late_fees(patron_id: str, book_id: int, payment_gateway: PaymentGateway
         success, msg, txn = pay_late_fees("123456", 1, mock_gateway)
     """
     # Validate patron ID
-    if not patron_id or not patron_id.isdigit() or len(patron_id) != 6:
+    if not _is_valid_patron_id(patron_id):
         return False, "Invalid patron ID. Must be exactly 6 digits.", None
     
     # Calculate late fee first
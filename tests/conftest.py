@@ -1,33 +1,144 @@
+import hashlib
 import os
+from datetime import datetime, timedelta
+
 import pytest
 from flask import Flask
-from database import get_db_connection
-from routes.catalog_routes import catalog_bp
-from routes.borrowing_routes import borrowing_bp
-from routes.search_routes import search_bp
-from routes.reports_routes import reports_bp
+import database
+
+# Computed once at import; the templates directory never moves.
+TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "templates"))
+from database import get_db_connection, init_database
+from services.library_service import invalidate_caches
+
+@pytest.fixture(scope="session", autouse=True)
+def test_database():
+    """
+    Point the whole session at a shared in-memory SQLite database.
+
+    The shared-cache URI keeps one in-memory database alive for as long as
+    this anchor connection stays open, while every database helper keeps
+    opening its own short-lived connection to the same name. Tests no
+    longer touch (or fight over) the on-disk library.db.
+
+    In-memory databases never cross process boundaries, so under
+    pytest-xdist every worker automatically gets its own private database
+    and the suite can run with -n auto without extra isolation work.
+    """
+    original = database.DATABASE
+    database.DATABASE = "file:library_test_db?mode=memory&cache=shared"
+    anchor = get_db_connection()  # keeps the in-memory database alive
+    init_database()
+    yield
+    # Let SQLite refresh planner statistics while the schema and data
+    # churned by the session are still around; a capped analysis keeps
+    # this teardown cheap.
+    anchor.execute("PRAGMA analysis_limit=400")
+    anchor.execute("PRAGMA optimize")
+    anchor.close()
+    database.DATABASE = original
 
 def reset_database():
     """
     Reset the database by clearing all tables.
+
+    Tests that never write leave nothing to clean, so the DELETEs (and
+    their commit) only run when a previous test actually left rows behind.
+    A transaction-rollback scheme is not an option here: every database
+    helper opens its own short-lived connection, so there is no shared
+    transaction for the fixture to roll back.
     """
     conn = get_db_connection()
     try:
-        conn.execute("DELETE FROM borrow_records")
-        conn.execute("DELETE FROM books")
-        conn.commit()
+        dirty = conn.execute(
+            "SELECT EXISTS(SELECT 1 FROM borrow_records) OR EXISTS(SELECT 1 FROM books)"
+        ).fetchone()[0]
+        if dirty:
+            # One script round-trip clears both tables (child table first)
+            conn.executescript("DELETE FROM borrow_records; DELETE FROM books;")
     finally:
         conn.close()
+    invalidate_caches()
+    database.invalidate_book_cache()
 
 @pytest.fixture(autouse=True)
 def clear_db():
     reset_database()
     yield
 
+def _node_digits(nodeid, n):
+    """Derive a stable n-digit string from a test's node id."""
+    return f"{int(hashlib.sha1(nodeid.encode()).hexdigest(), 16) % 10**n:0{n}d}"
+
+@pytest.fixture
+def isbn(request):
+    """
+    Deterministic 13-digit ISBN unique to the requesting test, so tests
+    that need a fresh (or guaranteed-absent) ISBN own their keyspace
+    instead of relying on hard-coded values and test ordering.
+    """
+    return _node_digits(request.node.nodeid, 13)
+
+@pytest.fixture
+def patron_id(request):
+    """Deterministic 6-digit patron ID unique to the requesting test."""
+    return _node_digits(request.node.nodeid, 6)
+
 @pytest.fixture
+def seed_loans():
+    """
+    Factory that seeds books plus one borrow record each for a patron over
+    a single connection and commit, instead of a chain of service calls
+    that each open, commit and close their own connection.
+
+    Call with the patron ID and a list of (title, author, isbn, copies)
+    tuples; returned=True marks every loan as returned on time. Returns
+    the new book ids in input order.
+    """
+    def _seed(patron_id, books, returned=False):
+        now = datetime.now()
+        conn = get_db_connection()
+        try:
+            book_ids = [
+                conn.execute(
+                    "INSERT INTO books (title, author, isbn, total_copies, available_copies) VALUES (?, ?, ?, ?, ?)",
+                    (title, author, isbn, copies, copies if returned else copies - 1),
+                ).lastrowid
+                for title, author, isbn, copies in books
+            ]
+            conn.executemany(
+                "INSERT INTO borrow_records (patron_id, book_id, borrow_date, due_date, return_date) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (patron_id, book_id, now.isoformat(), (now + timedelta(days=14)).isoformat(),
+                     (now + timedelta(days=1)).isoformat() if returned else None)
+                    for book_id in book_ids
+                ],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        invalidate_caches()
+        database.invalidate_book_cache()
+        return book_ids
+    return _seed
+
+@pytest.fixture(scope="session")
 def app():
-    template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "templates"))
-    app = Flask(__name__, template_folder=template_dir)
+    """
+    Build the Flask app once per session; the blueprints and template path
+    never change between tests, and per-test isolation comes from the
+    autouse clear_db fixture resetting the database state.
+
+    The blueprint imports live here rather than at module level so that
+    collection-only runs (--collect-only, pytest -k with no match) never
+    pay for importing the route modules.
+    """
+    from routes.catalog_routes import catalog_bp
+    from routes.borrowing_routes import borrowing_bp
+    from routes.search_routes import search_bp
+    from routes.reports_routes import reports_bp
+
+    app = Flask(__name__, template_folder=TEMPLATE_DIR)
     app.secret_key = "test_secret_key"
     app.config["TESTING"] = True
 
@@ -41,4 +152,11 @@ def app():
 
 @pytest.fixture
 def client(app):
+    """
+    Fresh client per test. The client is not stateless: flash messages
+    ride the signed session cookie, so a shared client's cookie jar
+    would carry an unconsumed flash from one test into the next page
+    another test renders. Building a client is cheap; sharing the app
+    is where the session-scope saving lives.
+    """
     return app.test_client()
\ No newline at end of file
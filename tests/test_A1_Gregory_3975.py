@@ -1,7 +1,6 @@
-import os
 import pytest
 from datetime import datetime, timedelta
-from unittest.mock import Mock
+from freezegun import freeze_time
 
 from services.library_service import (
     add_book_to_catalog, 
@@ -12,10 +11,22 @@ from services.library_service import (
     get_patron_status_report,
 )
 
-from database import get_book_by_isbn, update_borrow_record_return_date, get_patron_borrowing_history
+from database import (
+    get_book_by_isbn,
+    insert_book,
+    update_borrow_record_return_date,
+    get_patron_borrowing_history,
+    get_all_books,
+    insert_books,
+)
 
 ''' Tests for Functional Requirements '''
 
+# Over-limit field values shared by the R1 validation cases, built once
+# at import instead of repeated inline literals.
+LONG_TITLE = "book" * 54 + " "   # > 200 chars after strip
+LONG_AUTHOR = "Name" * 36        # > 100 chars
+
 # R1: Add Book To Catalog
 def test_add_book_valid_input():
     # Test1 adding a book with valid input.
@@ -25,82 +36,53 @@ def test_add_book_valid_input():
     assert "successfully added" in message.lower()
 
 
-def test_add_book_long_title():
+@pytest.mark.parametrize("title,author,isbn,copies,expected_error", [
     # Test2 adding a book with a title over 200 chars.
-    success, message = add_book_to_catalog("bookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbookbook ", "Author With Long Book Name", "1000000000002", 5)
-    
-    assert success == False
-    assert "Title must be less than 200 characters." in message
-
-
-def test_add_book_long_author():
+    (LONG_TITLE, "Author With Long Book Name", "1000000000002", 5,
+     "Title must be less than 200 characters."),
     # Test3 adding a book with a author over 100 chars.
-    success, message = add_book_to_catalog("How to Deal with a Having Long Name", "NameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameNameName", "1000000000003", 5)
-    
-    assert success == False
-    assert "Author must be less than 100 characters." in message
-
-
-def test_add_book_long_isbn():
+    ("How to Deal with a Having Long Name", LONG_AUTHOR, "1000000000003", 5,
+     "Author must be less than 100 characters."),
     # Test4 adding a book with a isbn over 13 digits.
-    success, message = add_book_to_catalog("Best Book Ever", "Best Author Ever", "10000000000044444", 5)
-    
-    assert success == False
-    assert "ISBN must be exactly 13 digits." in message
-
-
-def test_add_book_negative_copies():
+    ("Best Book Ever", "Best Author Ever", "10000000000044444", 5,
+     "ISBN must be exactly 13 digits."),
     # Test5 adding a book with a total_copies with negative number.
-    success, message = add_book_to_catalog("Really Cool Book", "Really Cool Author", "1000000000005", -12)
-    
+    ("Really Cool Book", "Really Cool Author", "1000000000005", -12,
+     "Total copies must be a positive integer."),
+    # Test7 adding a book with an empty title.
+    ("", "Some Author", "1000000000007", 5, "Title is required."),
+    # Test8 adding a book with an empty author.
+    ("Some Book", "", "1000000000008", 5, "Author is required."),
+    # Test9 adding a book with whitespace title.
+    ("   ", "Author Name", "1000000000010", 1, "Title is required."),
+    # Test10 adding a book with an whitespace author.
+    ("Whitespace Author Test", "   ", "1000000000011", 1, "Author is required."),
+    # Test11 adding a book with a total_copies of zero.
+    ("Empty Library", "Zero Author", "1000000000012", 0,
+     "Total copies must be a positive integer."),
+], ids=[
+    "long_title", "long_author", "long_isbn", "negative_copies",
+    "empty_title", "empty_author", "whitespace_title", "whitespace_author",
+    "zero_copies",
+])
+def test_add_book_invalid_input(title, author, isbn, copies, expected_error):
+    # Tests 2-5 and 7-11: each case rejects exactly one bad field.
+    success, message = add_book_to_catalog(title, author, isbn, copies)
+
     assert success == False
-    assert "Total copies must be a positive integer." in message
+    assert expected_error in message
 
 
 def test_add_book_duplicate_isbn():
-    # Test6 adding a book with a duplicate isbn.
-    add_book_to_catalog("The way I used to be", "Allan Shirt", "1000000000006", 5) 
+    # Test6 adding a book with a duplicate isbn. The first book is seeded
+    # with the database helper directly; only the second call is under test.
+    insert_book("The way I used to be", "Allan Shirt", "1000000000006", 5, 5)
     success, message = add_book_to_catalog("The way I am", "Allan Shirt", "1000000000006", 5)
     
     assert success == False
     assert "A book with this ISBN already exists." in message
 
 
-def test_add_book_empty_title():
-    # Test7 adding a book with an empty title.
-    success, message = add_book_to_catalog("", "Some Author", "1000000000007", 5)
-    
-    assert success == False
-    assert "Title is required." in message
-
-
-def test_add_book_empty_author():  
-    # Test8 adding a book with an empty author.
-    success, message = add_book_to_catalog("Some Book", "", "1000000000008", 5)
-    
-    assert success == False
-    assert "Author is required." in message
-
-def test_add_book_whitespace_title():
-    # Test9 adding a book with whitespace title.
-    success, message = add_book_to_catalog("   ", "Author Name", "1000000000010", 1)
-    assert success == False
-    assert "Title is required." in message
-
-
-def test_add_book_whitespace_author():
-    # Test10 adding a book with an whitespace author.
-    success, message = add_book_to_catalog("Whitespace Author Test", "   ", "1000000000011", 1)
-    assert success == False
-    assert "Author is required." in message
-
-def test_add_book_zero_copies():
-    # Test11 adding a book with a total_copies of zero.
-    success, message = add_book_to_catalog("Empty Library", "Zero Author", "1000000000012", 0)
-    assert success == False
-    assert "Total copies must be a positive integer." in message
-
-
 #-----------------------------------------------------------------------------------------------------------------------
 
 # R2: Book Catalog Display
@@ -120,11 +102,13 @@ def test_catalog_book_fields_present(client):
     add_book_to_catalog("Field Test Book", "Field Author", "2000000000003", 3)
     response = client.get("/catalog")
     
-    # Check that required fields are present in the rendered HTML
-    html = response.data.decode()
-    assert "Field Test Book" in html
-    assert "Field Author" in html
-    assert "2000000000003" in html
+    # Check that required fields are present in the rendered HTML;
+    # substring checks work directly on the bytes body without decoding.
+    # Bind the body once rather than re-evaluating the data property.
+    body = response.get_data()
+    assert b"Field Test Book" in body
+    assert b"Field Author" in body
+    assert b"2000000000003" in body
 
 
 def test_catalog_available_copies_match(client):
@@ -134,12 +118,12 @@ def test_catalog_available_copies_match(client):
     borrow_book_by_patron("123456", book["id"])
     response = client.get("/catalog")
     
-    html = response.data.decode()
+    body = response.get_data()
     # Ensure the borrowed book is listed
-    assert "Borrowable Book" in html
+    assert b"Borrowable Book" in body
     # Available copies should be reduced (1 left out of 2)
-    assert "1" in html  # available copies
-    assert "2" in html  # total copies
+    assert b"1" in body  # available copies
+    assert b"2" in body  # total copies
 
 
 def test_catalog_duplicate_books_displayed_once(client):
@@ -148,10 +132,9 @@ def test_catalog_duplicate_books_displayed_once(client):
     add_book_to_catalog("Unique Book 2", "Unique Author 2", "2000000000005", 1)
     
     response = client.get("/catalog")
-    html = response.data.decode()
-    
+
     # ISBN should appear only once
-    assert html.count("2000000000005") == 1
+    assert response.data.count(b"2000000000005") == 1
 
 #-----------------------------------------------------------------------------------------------------------------------
     
@@ -186,10 +169,10 @@ def test_borrow_book_by_patron_invalid_book_id():
 
 
 def test_borrow_book_by_patron_unavailable_book():
-    # Test4 borrowing a book that is unavailable.
-    add_book_to_catalog("Unavailable Book", "No Author", "3000000000004", 1)
+    # Test4 borrowing a book that is unavailable. Seed a book with no
+    # available copies directly; only the borrow below is under test.
+    insert_book("Unavailable Book", "No Author", "3000000000004", 1, 0)
     book = get_book_by_isbn("3000000000004")
-    borrow_book_by_patron("300004", book["id"])
 
     success, message = borrow_book_by_patron("310004", book["id"])
     
@@ -200,14 +183,15 @@ def test_borrow_book_by_patron_unavailable_book():
 def test_borrow_book_by_patron_exceed_limit():
     # Test5 borrowing a book when patron has already borrowed 5 books.
     patron_id = "300005"
-    
-    # Borrow 5 books for the patron
-    for i in range(5):
-        isbn = f"350000000000{i+1}"
-        add_book_to_catalog(f"Book {i+1}", f"Author {i+1}", isbn, 1)
-        book = get_book_by_isbn(isbn)
+
+    # Seed 5 borrowable books with one bulk insert, then borrow them all
+    insert_books([
+        (f"Book {i+1}", f"Author {i+1}", f"350000000000{i+1}", 1, 1)
+        for i in range(5)
+    ])
+    for book in get_all_books():
         borrow_book_by_patron(patron_id, book["id"])
-    
+
     # Borrow a 6th book
     add_book_to_catalog("Extra Book", "Extra Author", "3000000000006", 1)
     book = get_book_by_isbn("3000000000006")
@@ -269,11 +253,11 @@ def test_return_book_by_patron_not_borrowed():
 
 def test_return_book_multiple_patrons_same_book():
     # Test5 ensure each patron can only return books they borrowed
-    add_book_to_catalog("Shared Book", "Author", "4000000000008", 2)
+    insert_book("Shared Book", "Author", "4000000000008", 2, 2)
     book = get_book_by_isbn("4000000000008")
-    
+
     borrow_book_by_patron("400008", book["id"])
-    
+
     success, message = return_book_by_patron("410008", book["id"])
     assert success is False
     assert "Book not borrowed by patron." in message
@@ -331,18 +315,21 @@ def test_calculate_late_fee_for_book_invalid_book_id():
     assert "status" in result # checks that the key exists
     assert result['status'] == "Book not found." 
 
-def test_calculate_late_fee_for_book_not_borrowed():
+def test_calculate_late_fee_for_book_not_borrowed(isbn, patron_id):
     # Test4 book not borrowed by the patron should return an error status.
-    add_book_to_catalog("Late Fee Book", "Late Author", "5000000000004", 1)
-    book = get_book_by_isbn("5000000000004")
-    result = calculate_late_fee_for_book("500004", book["id"])
+    add_book_to_catalog("Late Fee Book", "Late Author", isbn, 1)
+    book = get_book_by_isbn(isbn)
+    result = calculate_late_fee_for_book(patron_id, book["id"])
     
     assert isinstance(result, dict)
     assert "status" in result # checks that the key exists
     assert result['status'] == "Book not borrowed by patron."
 
+@freeze_time("2024-01-01")
 def test_calculate_late_fee_accurate_fee_calculation():
     # Test5 book overdue 10 days should be 3.50 + (10-7)*1 = 6.50
+    # Frozen clock: the test and the service both read datetime.now(), and
+    # without freezing, the result depends on wall-clock drift between them.
     add_book_to_catalog("Important book", "Mr.Important", "5000000000005", 1)
     book = get_book_by_isbn("5000000000005")
     borrow_book_by_patron("500005", book["id"])
@@ -367,61 +354,58 @@ def test_calculate_late_fee_not_returned_book():
     assert result['status'] == "Book not returned."
 
 
-def test_calculate_late_fee_zero_overdue():
+@pytest.fixture
+def overdue_loan():
+    """
+    Factory sharing the late-fee setup boilerplate: add a book, borrow
+    it, and mark it returned `days` after its due date (0 = on the due
+    date). Returns the book id.
+    """
+    def _make(patron, isbn, days, title="Fee Test Book"):
+        add_book_to_catalog(title, "Author", isbn, 1)
+        book = get_book_by_isbn(isbn)
+        borrow_book_by_patron(patron, book["id"])
+        record = get_patron_borrowing_history(patron)[0]
+        update_borrow_record_return_date(patron, book["id"], record["due_date"] + timedelta(days=days))
+        return book["id"]
+    return _make
+
+
+def test_calculate_late_fee_zero_overdue(overdue_loan):
     # Test7 book returned exactly on due date should have zero fee
-    add_book_to_catalog("On Time Book", "Author", "5000000000010", 1)
-    book = get_book_by_isbn("5000000000010")
-    borrow_book_by_patron("500010", book["id"])
-    # Set return_date exactly on due_date
-    record = get_patron_borrowing_history("500010")[0]
-    update_borrow_record_return_date("500010", book["id"], record["due_date"])
-    
-    result = calculate_late_fee_for_book("500010", book["id"])
+    book_id = overdue_loan("500010", "5000000000010", 0, title="On Time Book")
+
+    result = calculate_late_fee_for_book("500010", book_id)
     assert result['fee_amount'] == 0.00
     assert result['days_overdue'] == 0
     assert result['status'] == "Book is not overdue."
 
 
-def test_calculate_late_fee_max_fee_cap():
+def test_calculate_late_fee_max_fee_cap(overdue_loan):
     # Test8 book overdue more than enough days to hit $15 max
-    add_book_to_catalog("Max Fee Book", "Author", "5000000000011", 1)
-    book = get_book_by_isbn("5000000000011")
-    borrow_book_by_patron("500011", book["id"])
-    
-    record = get_patron_borrowing_history("500011")[0]
-    update_borrow_record_return_date("500011", book["id"], record["due_date"] + timedelta(days=25))
-    
-    result = calculate_late_fee_for_book("500011", book["id"])
+    book_id = overdue_loan("500011", "5000000000011", 25, title="Max Fee Book")
+
+    result = calculate_late_fee_for_book("500011", book_id)
     assert round(result['fee_amount'], 2) == 15.00
     assert result['days_overdue'] == 25
     assert result['status'] == "Fee amount successfully calculated."
 
 
-def test_calculate_late_fee_under_seven_days():
+def test_calculate_late_fee_under_seven_days(overdue_loan):
     # Test9 Book overdue 5 days (under 7) should be 5*0.5 = 2.5
-    add_book_to_catalog("Short Overdue Book", "Author", "5000000000012", 1)
-    book = get_book_by_isbn("5000000000012")
-    borrow_book_by_patron("500012", book["id"])
-    
-    record = get_patron_borrowing_history("500012")[0]
-    update_borrow_record_return_date("500012", book["id"], record["due_date"] + timedelta(days=5))
-    
-    result = calculate_late_fee_for_book("500012", book["id"])
+    book_id = overdue_loan("500012", "5000000000012", 5, title="Short Overdue Book")
+
+    result = calculate_late_fee_for_book("500012", book_id)
     assert round(result['fee_amount'], 2) == 2.50
     assert result['days_overdue'] == 5
     assert result['status'] == "Fee amount successfully calculated."
 
 
-def test_calculate_late_fee_exactly_seven_days():
+def test_calculate_late_fee_exactly_seven_days(overdue_loan):
     # Test10 Book overdue exactly 7 days should use $0.5 per day = 3.5
-    add_book_to_catalog("Seven Day Book", "Author", "5000000000013", 1)
-    book = get_book_by_isbn("5000000000013")
-    borrow_book_by_patron("500013", book["id"])
-    
-    record = get_patron_borrowing_history("500013")[0]
-    update_borrow_record_return_date("500013", book["id"], record["due_date"] + timedelta(days=7))
-    
-    result = calculate_late_fee_for_book("500013", book["id"])
+    book_id = overdue_loan("500013", "5000000000013", 7, title="Seven Day Book")
+
+    result = calculate_late_fee_for_book("500013", book_id)
     assert round(result['fee_amount'], 2) == 3.50
     assert result['days_overdue'] == 7
     assert result['status'] == "Fee amount successfully calculated."
@@ -440,8 +424,10 @@ def test_search_books_in_catalog_by_title_partial():
     results = search_books_in_catalog("creativ", "title")
     
     assert isinstance(results, list)
-    assert any("how to be creative" in book["title"].lower() for book in results)
-    assert any("creativity" in book["title"].lower() for book in results)
+    # Materialize the titles once, then do O(1) membership checks.
+    titles_lower = {book["title"].lower() for book in results}
+    assert "how to be creative" in titles_lower
+    assert "creativity" in titles_lower
 
 def test_search_books_in_catalog_by_author_partial():
     # Test2 searching books by author (partial, case-insensitive).
@@ -450,7 +436,8 @@ def test_search_books_in_catalog_by_author_partial():
     results = search_books_in_catalog("colli", "author")
     
     assert isinstance(results, list)
-    assert any("suzanne collins" in book["author"].lower() for book in results)
+    authors_lower = {book["author"].lower() for book in results}
+    assert "suzanne collins" in authors_lower
 
 def test_search_books_in_catalog_by_isbn_exact():
     # Test3 searching books by ISBN (exact match only).
@@ -459,7 +446,7 @@ def test_search_books_in_catalog_by_isbn_exact():
     results = search_books_in_catalog("6000000000004", "isbn")
     
     assert isinstance(results, list)
-    assert any(book["isbn"] == "6000000000004" for book in results)
+    assert "6000000000004" in {book["isbn"] for book in results}
 
 def test_search_books_in_catalog_no_results():
     # Test4 searching books with no results found.
@@ -514,9 +501,9 @@ def test_get_patron_status_report_invalid_patron_id():
     assert isinstance(report, dict)
     assert "Invalid patron ID. Must be exactly 6 digits." in report.get('status')
 
-def test_get_patron_status_report_no_borrowed_books():
+def test_get_patron_status_report_no_borrowed_books(patron_id):
     # Test3: getting patron status for a patron with no borrowed books.
-    report = get_patron_status_report("638054")
+    report = get_patron_status_report(patron_id)
     
     assert isinstance(report, dict)
     assert len(report["current_borrowed_books"]) == 0
@@ -538,16 +525,12 @@ def test_get_patron_status_report_borrow_count():
     assert isinstance(report, dict)
     assert len(report["current_borrowed_books"]) == report["num_current_borrowed_books"]
 
-def test_get_patron_status_report_borrowing_history():
+def test_get_patron_status_report_borrowing_history(seed_loans):
     # Test5: borrowing_history should include 2 books, current books should not have any books.
-    add_book_to_catalog("I love books", "Book Lover", "7000000000003", 2)
-    add_book_to_catalog("I hate books", "Book Hater", "7000000000004", 1)
-    book1 = get_book_by_isbn("7000000000003")
-    book2 = get_book_by_isbn("7000000000004")
-    borrow_book_by_patron("823649", book1["id"])
-    borrow_book_by_patron("823649", book2["id"])
-    return_book_by_patron("823649", book1["id"])
-    return_book_by_patron("823649", book2["id"])
+    seed_loans("823649", [
+        ("I love books", "Book Lover", "7000000000003", 2),
+        ("I hate books", "Book Hater", "7000000000004", 1),
+    ], returned=True)
 
     report = get_patron_status_report("823649")
     
@@ -581,14 +564,12 @@ def test_get_patron_status_report_overdue_books():
     assert report["num_current_borrowed_books"] == 0
 
 
-def test_get_patron_status_report_multiple_current_books():
+def test_get_patron_status_report_multiple_current_books(seed_loans):
     # Test7: patron currently borrowing multiple books
-    add_book_to_catalog("Book A", "Author A", "7000000000006", 1)
-    add_book_to_catalog("Book B", "Author B", "7000000000007", 1)
-    book1 = get_book_by_isbn("7000000000006")
-    book2 = get_book_by_isbn("7000000000007")
-    borrow_book_by_patron("700002", book1["id"])
-    borrow_book_by_patron("700002", book2["id"])
+    seed_loans("700002", [
+        ("Book A", "Author A", "7000000000006", 1),
+        ("Book B", "Author B", "7000000000007", 1),
+    ])
 
     report = get_patron_status_report("700002")
     assert report["num_current_borrowed_books"] == 2
@@ -14,34 +14,33 @@ from services.library_service import (
     refund_late_fee_payment
 )
 from services.payment_services import PaymentGateway
+from services import library_service
+from routes import catalog_routes
+from database import insert_books
 # -------------------------------------------------------------
 # Statement Coverage Tests for add_book_to_catalog
 
-def test_add_book_to_catalog_all_paths(mocker):
-    # invalid title
-    assert add_book_to_catalog("", "A", "1234567890123", 1)[0] is False
-    # long title
-    assert add_book_to_catalog("x"*201, "A", "1234567890123", 1)[0] is False
-    # invalid author
-    assert add_book_to_catalog("Book", "", "1234567890123", 1)[0] is False
-    # long author
-    assert add_book_to_catalog("Book", "x"*101, "1234567890123", 1)[0] is False
-    # invalid isbn
-    assert add_book_to_catalog("Book", "A", "123", 1)[0] is False
-    # invalid copies
-    assert add_book_to_catalog("Book", "A", "1234567890123", 0)[0] is False
-    # duplicate ISBN
-    mocker.patch("services.library_service.get_book_by_isbn", return_value={"id": 1})
-    assert add_book_to_catalog("Book", "A", "1234567890123", 1)[0] is False
-    
-    # successful insert
-    mocker.patch("services.library_service.get_book_by_isbn", return_value=None)
-    mocker.patch("services.library_service.insert_book", return_value=True)
-    assert add_book_to_catalog("Book", "A", "1234567890123", 1)[0] is True
-
-    # failed insert
-    mocker.patch("services.library_service.insert_book", return_value=False)
-    assert add_book_to_catalog("Book", "A", "1234567890123", 1)[0] is False
+@pytest.mark.parametrize("title,author,isbn,copies", [
+    ("", "A", "1234567890123", 1),         # invalid title
+    ("x"*201, "A", "1234567890123", 1),    # long title
+    ("Book", "", "1234567890123", 1),      # invalid author
+    ("Book", "x"*101, "1234567890123", 1), # long author
+    ("Book", "A", "123", 1),               # invalid isbn
+    ("Book", "A", "1234567890123", 0),     # invalid copies
+], ids=["empty_title", "long_title", "empty_author", "long_author",
+        "bad_isbn", "zero_copies"])
+def test_add_book_to_catalog_validation_paths(title, author, isbn, copies):
+    assert add_book_to_catalog(title, author, isbn, copies)[0] is False
+
+@pytest.mark.parametrize("insert_ok,existing,expected", [
+    (False, {"id": 1}, False),  # duplicate ISBN (insert ignored, book found)
+    (True, None, True),         # successful insert
+    (False, None, False),       # failed insert with no existing book
+], ids=["duplicate_isbn", "success", "db_error"])
+def test_add_book_to_catalog_db_paths(mocker, insert_ok, existing, expected):
+    mocker.patch.object(library_service, "insert_book", return_value=insert_ok)
+    mocker.patch.object(library_service, "get_book_by_isbn", return_value=existing)
+    assert add_book_to_catalog("Book", "A", "1234567890123", 1)[0] is expected
 
 # -------------------------------------------------------------
 # Statement Coverage Tests for Catalog Routes (catalog_bp) 
@@ -54,8 +53,7 @@ def test_catalog_index_redirects_to_catalog(client):
 
 def test_catalog_route_renders_books(client, mocker):
     # covers get_all_books(), render_template() path
-    mocker.patch(
-    "routes.catalog_routes.get_all_books",
+    mocker.patch.object(catalog_routes, "get_all_books",
     return_value=[{
         "title": "Book A",
         "author": "Author A",
@@ -87,8 +85,7 @@ def test_add_book_post_invalid_total_copies_conversion(client):
 
 def test_add_book_post_business_logic_failure(client, mocker):
     # covers validation failure paths in add_book_to_catalog
-    mocker.patch(
-        "routes.catalog_routes.add_book_to_catalog",
+    mocker.patch.object(catalog_routes, "add_book_to_catalog",
         return_value=(False, "Some error occurred")
     )
     response = client.post("/add_book", data={
@@ -102,8 +99,7 @@ def test_add_book_post_business_logic_failure(client, mocker):
 
 def test_add_book_post_success_redirects(client, mocker):
     #covers success branch of add_book  
-    mocker.patch(
-        "routes.catalog_routes.add_book_to_catalog",
+    mocker.patch.object(catalog_routes, "add_book_to_catalog",
         return_value=(True, "Book added successfully!")
     )
     response = client.post("/add_book", data={
@@ -115,128 +111,123 @@ def test_add_book_post_success_redirects(client, mocker):
     assert response.status_code == 302
     assert "/catalog" in response.headers["Location"]
 
+def test_catalog_lists_added_book_details(client, isbn):
+    # server-rendered row contents, checked in-process instead of via the
+    # E2E browser tests
+    add_book_to_catalog("Wicked", "Gregory Maguire", isbn, 5)
+    response = client.get("/catalog")
+    body = response.get_data(as_text=True)
+    assert "Wicked" in body
+    assert "Gregory Maguire" in body
+    assert isbn in body
+    assert "5/5 Available" in body
+
+def test_reports_lists_current_borrowed_books(client, seed_loans, patron_id, isbn):
+    seed_loans(patron_id, [("Hunger Games", "Suzanne Collins", isbn, 4)])
+    response = client.get(f"/reports?patron_id={patron_id}")
+    body = response.get_data(as_text=True)
+    assert "Hunger Games" in body
+    assert "Suzanne Collins" in body
+
 # -------------------------------------------------------------
 # Statement Coverage Tests for borrow_book_by_patron
 
-def test_borrow_book_by_patron_all_paths(mocker):
-    # invalid patron id
-    assert borrow_book_by_patron("12", 1)[0] is False
-    # book does not exist
-    mocker.patch("services.library_service.get_book_by_id", return_value=None)
-    assert borrow_book_by_patron("123456", 1)[0] is False
-    # unavailable book
-    mocker.patch("services.library_service.get_book_by_id",
-                 return_value={"available_copies": 0})
-    assert borrow_book_by_patron("123456", 1)[0] is False
-    # borrow count >= 5
-    mocker.patch("services.library_service.get_book_by_id",
-                 return_value={"available_copies": 1, "title": "B"})
-    mocker.patch("services.library_service.get_patron_borrow_count", return_value=5)
-    assert borrow_book_by_patron("123456", 1)[0] is False
-    # failed insert
-    mocker.patch("services.library_service.get_patron_borrow_count", return_value=0)
-    mocker.patch("services.library_service.insert_borrow_record", return_value=False)
-    assert borrow_book_by_patron("123456", 1)[0] is False
-    # availability update fails
-    mocker.patch("services.library_service.insert_borrow_record", return_value=True)
-    mocker.patch("services.library_service.update_book_availability", return_value=False)
-    assert borrow_book_by_patron("123456", 1)[0] is False
-    # success
-    mocker.patch("services.library_service.update_book_availability", return_value=True)
-    assert borrow_book_by_patron("123456", 1)[0] is True
+@pytest.mark.parametrize("patron,book,borrow_count,txn_ok,expected", [
+    ("12", None, 0, True, False),                                # invalid patron id
+    ("123456", None, 0, True, False),                            # book does not exist
+    ("123456", {"available_copies": 0}, 0, True, False),         # unavailable book
+    ("123456", {"available_copies": 1, "title": "B"}, 5, True, False),  # count >= 5
+    ("123456", {"available_copies": 1, "title": "B"}, 0, False, False), # txn fails
+    ("123456", {"available_copies": 1, "title": "B"}, 0, True, True),   # success
+], ids=["invalid_patron", "book_not_found", "unavailable", "limit_reached",
+        "txn_fails", "success"])
+def test_borrow_book_by_patron_paths(mocker, patron, book, borrow_count, txn_ok, expected):
+    mocker.patch.object(library_service, "get_book_by_id", return_value=book)
+    mocker.patch.object(library_service, "get_patron_borrow_count",
+                 return_value=borrow_count)
+    mocker.patch.object(library_service, "execute_borrow_transaction",
+                 return_value=txn_ok)
+    assert borrow_book_by_patron(patron, 1)[0] is expected
 
 # -------------------------------------------------------------
 # Statement Coverage Tests for return_book_by_patron
 
-def test_return_book_by_patron_all_paths(mocker):
-    # invalid patron id
-    assert return_book_by_patron("12", 1)[0] is False
-    # book not found
-    mocker.patch("services.library_service.get_book_by_id", return_value=None)
-    assert return_book_by_patron("123456", 1)[0] is False
-    # not borrowed
-    mocker.patch("services.library_service.get_book_by_id", return_value={"id": 1})
-    mocker.patch("services.library_service.get_patron_borrowed_books", return_value=[])
-    assert return_book_by_patron("123456", 1)[0] is False
-
-    # availability update fails
-    mocker.patch("services.library_service.get_patron_borrowed_books",
-                 return_value=[{"book_id": 1}])
-    mocker.patch("services.library_service.update_book_availability", return_value=False)
-    assert return_book_by_patron("123456", 1)[0] is False
-
-    # return record update fails 
-    mocker.patch("services.library_service.update_book_availability", return_value=True)
-    mocker.patch("services.library_service.update_borrow_record_return_date", return_value=False)
-    mocker.patch("services.library_service.update_book_availability", return_value=True)
-    assert return_book_by_patron("123456", 1)[0] is False
-
-    # late fee errors 
-    mocker.patch("services.library_service.update_borrow_record_return_date", return_value=True)
-    mocker.patch("services.library_service.calculate_late_fee_for_book",
-                 return_value={"status": "Some Error"})
-    assert return_book_by_patron("123456", 1)[0] is True
-
-    # success
-    mocker.patch("services.library_service.calculate_late_fee_for_book",
-                 return_value={"status": "Book is not overdue.", "fee_amount": 0, "days_overdue": 0})
-    
-    assert return_book_by_patron("123456", 1)[0] is True
+@pytest.mark.parametrize("patron,book,record,avail_ok,ret_ok,fee,expected", [
+    ("12", None, None, True, True, None, False),                 # invalid patron id
+    ("123456", None, None, True, True, None, False),             # book not found
+    ("123456", {"id": 1}, None, True, True, None, False),        # not borrowed
+    ("123456", {"id": 1}, {"book_id": 1}, False, True, None, False),  # availability fails
+    ("123456", {"id": 1}, {"book_id": 1}, True, False, None, False),  # record update fails
+    ("123456", {"id": 1}, {"book_id": 1}, True, True,
+     {"status": "Some Error"}, True),                            # late fee errors
+    ("123456", {"id": 1}, {"book_id": 1}, True, True,
+     {"status": "Book is not overdue.", "fee_amount": 0, "days_overdue": 0}, True),
+], ids=["invalid_patron", "book_not_found", "not_borrowed", "availability_fails",
+        "record_update_fails", "fee_error", "success"])
+def test_return_book_by_patron_paths(mocker, patron, book, record, avail_ok,
+                                     ret_ok, fee, expected):
+    mocker.patch.object(library_service, "get_book_by_id", return_value=book)
+    mocker.patch.object(library_service, "get_active_borrow_record", return_value=record)
+    mocker.patch.object(library_service, "update_book_availability",
+                 return_value=avail_ok)
+    mocker.patch.object(library_service, "update_borrow_record_return_date",
+                 return_value=ret_ok)
+    mocker.patch.object(library_service, "calculate_late_fee_for_book",
+                 return_value=fee)
+    assert return_book_by_patron(patron, 1)[0] is expected
 
 # -------------------------------------------------------------
 # Statement Coverage Tests for calculate_late_fee_for_book
-def test_calculate_late_fee_for_book_all_paths(mocker):
-    # invalid patron id
-    result = calculate_late_fee_for_book("12", 1)
-    assert result["status"].startswith("Invalid")
-    # book not found
-    mocker.patch("services.library_service.get_book_by_id", return_value=None)
-    result = calculate_late_fee_for_book("123456", 1)
-    assert result["status"] == "Book not found."
-    # record not found
-    mocker.patch("services.library_service.get_book_by_id", return_value={"id": 1})
-    mocker.patch("services.library_service.get_patron_borrowing_history", return_value=[])
-    result = calculate_late_fee_for_book("123456", 1)
-    assert result["status"] == "Book not borrowed by patron."
-    # not returned
-    mocker.patch("services.library_service.get_patron_borrowing_history",
-                 return_value=[{"book_id": 1, "return_date": None}])
-    result = calculate_late_fee_for_book("123456", 1)
-    assert result["status"] == "Book not returned."
-    # not overdue
-    now = datetime.now()
-    mocker.patch("services.library_service.get_patron_borrowing_history",
-                 return_value=[{"book_id": 1, "return_date": now, "due_date": now}])
-    result = calculate_late_fee_for_book("123456", 1)
-    assert result["status"] == "Book is not overdue."
-    # <= 7 days overdue
-    mocker.patch("services.library_service.get_patron_borrowing_history",
-                 return_value=[{"book_id": 1,
-                                "return_date": now + timedelta(days=5),
-                                "due_date": now}])
-    result = calculate_late_fee_for_book("123456", 1)
-    assert round(result["fee_amount"], 2) == 2.5
-    # > 7 days overdue (cap)
-    mocker.patch("services.library_service.get_patron_borrowing_history",
-                 return_value=[{"book_id": 1,
-                                "return_date": now + timedelta(days=20),
-                                "due_date": now}])
-    result = calculate_late_fee_for_book("123456", 1)
-    assert round(result["fee_amount"], 2) == 15.00
+
+NOW = datetime(2024, 1, 1)
+
+@pytest.mark.parametrize("patron,book,history,status,fee", [
+    ("12", None, [], "Invalid patron ID.", None),
+    ("123456", None, [], "Book not found.", None),
+    ("123456", {"id": 1}, [], "Book not borrowed by patron.", None),
+    ("123456", {"id": 1},
+     [{"book_id": 1, "return_date": None}], "Book not returned.", None),
+    ("123456", {"id": 1},
+     [{"book_id": 1, "return_date": NOW, "due_date": NOW}],
+     "Book is not overdue.", None),
+    ("123456", {"id": 1},
+     [{"book_id": 1, "return_date": NOW + timedelta(days=5), "due_date": NOW}],
+     None, 2.5),
+    ("123456", {"id": 1},
+     [{"book_id": 1, "return_date": NOW + timedelta(days=20), "due_date": NOW}],
+     None, 15.00),
+], ids=["invalid_patron", "book_not_found", "not_borrowed", "not_returned",
+        "not_overdue", "under_cap", "over_cap"])
+def test_calculate_late_fee_for_book_paths(mocker, patron, book, history, status, fee):
+    mocker.patch.object(library_service, "get_book_by_id", return_value=book)
+    mocker.patch.object(library_service, "get_patron_borrowing_history",
+                 return_value=history)
+    result = calculate_late_fee_for_book(patron, 1)
+    if status is not None:
+        assert result["status"].startswith(status)
+    if fee is not None:
+        assert round(result["fee_amount"], 2) == fee
 
 # -------------------------------------------------------------
 # Statement Coverage Tests for search_books_in_catalog
-def test_search_books_in_catalog_all_paths(mocker):
-    mocker.patch("services.library_service.get_all_books",
-                 return_value=[
-                     {"title": "Alpha", "author": "John", "isbn": "111"},
-                     {"title": "Beta", "author": "Jane", "isbn": "222"}
-                 ])
-    assert search_books_in_catalog("   ", "title") == [] 
-    assert len(search_books_in_catalog("alp", "title")) == 1
-    assert len(search_books_in_catalog("jan", "author")) == 1 
-    assert len(search_books_in_catalog("111", "isbn")) == 1
-    assert search_books_in_catalog("alp", "bad") == []
+
+@pytest.fixture
+def two_books():
+    # seed real rows in one batch since filtering happens in SQL, not Python
+    insert_books([
+        ("Alpha", "John", "1111111111111", 1, 1),
+        ("Beta", "Jane", "2222222222222", 1, 1),
+    ])
+
+@pytest.mark.parametrize("term,search_type,expected_len", [
+    ("   ", "title", 0),            # empty term
+    ("alp", "title", 1),            # title match
+    ("jan", "author", 1),           # author match
+    ("1111111111111", "isbn", 1),   # isbn match
+    ("alp", "bad", 0),              # invalid type
+], ids=["empty_term", "title", "author", "isbn", "bad_type"])
+def test_search_books_in_catalog_paths(two_books, term, search_type, expected_len):
+    assert len(search_books_in_catalog(term, search_type)) == expected_len
 
 # -------------------------------------------------------------
 # Statement Coverage Tests for get_patron_status_report
@@ -245,154 +236,127 @@ def test_get_patron_status_report_all_paths(mocker):
     r = get_patron_status_report("12")
     assert r["status"].startswith("Invalid")
     # no borrowed books, no history
-    mocker.patch("services.library_service.get_patron_borrowed_books", return_value=[])
-    mocker.patch("services.library_service.get_patron_borrowing_history", return_value=[])
-    mocker.patch("services.library_service.calculate_late_fee_for_book",
-                 return_value={"fee_amount": 0})
+    mocker.patch.object(library_service, "get_patron_borrowed_books", return_value=[])
+    mocker.patch.object(library_service, "get_patron_borrowing_history", return_value=[])
 
     r = get_patron_status_report("123456")
     assert r["num_current_borrowed_books"] == 0
-    # with borrowed & history (including returned books)
-    mocker.patch("services.library_service.get_patron_borrowed_books",
+    # with borrowed & history (returned 10 days overdue so a fee is owed)
+    mocker.patch.object(library_service, "get_patron_borrowed_books",
                  return_value=[{
                      "book_id": 1, "title": "A", "author": "B",
-                     "due_date": datetime.now(), "is_overdue": False
+                     "due_date": NOW, "is_overdue": False
                  }])
-    mocker.patch("services.library_service.get_patron_borrowing_history",
+    mocker.patch.object(library_service, "get_patron_borrowing_history",
                  return_value=[{
                      "book_id": 1, "title": "A", "author": "B",
-                     "borrow_date": datetime.now(),
-                     "due_date": datetime.now(),
-                     "return_date": datetime.now()
+                     "borrow_date": NOW - timedelta(days=24),
+                     "due_date": NOW - timedelta(days=10),
+                     "return_date": NOW
                  }])
-    mocker.patch("services.library_service.calculate_late_fee_for_book",
-                 return_value={"fee_amount": 1.0})
-    r = get_patron_status_report("123456")
-    assert r["total_fees_owed"] >= 0
+    # fresh patron id so the report cache from the first call is not hit
+    r = get_patron_status_report("654321")
+    assert r["total_fees_owed"] >= 1
 
 # -------------------------------------------------------------
 # Statement Coverage Tests for pay_late_fees
-def test_pay_late_fees_all_paths(mocker):
-    # invalid patron ID
-    assert pay_late_fees("12", 1, Mock(spec=PaymentGateway))[0] is False
-    # unable to calculate fee
-    mocker.patch("services.library_service.calculate_late_fee_for_book", return_value=None)
-    assert pay_late_fees("123456", 1, Mock(spec=PaymentGateway))[0] is False
-    # zero fee
-    mocker.patch("services.library_service.calculate_late_fee_for_book",
-                 return_value={"fee_amount": 0})
-    assert pay_late_fees("123456", 1, Mock(spec=PaymentGateway))[0] is False
-    # book not found
-    mocker.patch("services.library_service.calculate_late_fee_for_book",
-                 return_value={"fee_amount": 5})
-    mocker.patch("services.library_service.get_book_by_id", return_value=None)
-    assert pay_late_fees("123456", 1, Mock(spec=PaymentGateway))[0] is False
-    # payment success
-    mocker.patch("services.library_service.get_book_by_id",
-                 return_value={"title": "Book"})
-    pg = Mock(spec=PaymentGateway)
-    pg.process_payment.return_value = (True, "txn1", "OK")
-    assert pay_late_fees("123456", 1, pg)[0] is True
-    # payment fail
-    pg.process_payment.return_value = (False, None, "Nope")
-    assert pay_late_fees("123456", 1, pg)[0] is False
-    # exception path
-    pg.process_payment.side_effect = Exception("Err")
-    assert pay_late_fees("123456", 1, pg)[0] is False
+
+# Spec introspection of PaymentGateway happens once at import; each test
+# gets the same mock back with its state wiped (same scheme as the
+# branch-coverage file).
+_PG_MOCK = Mock(spec=PaymentGateway)
+
+@pytest.fixture
+def pg():
+    _PG_MOCK.reset_mock(return_value=True, side_effect=True)
+    return _PG_MOCK
+
+@pytest.mark.parametrize("patron,fee,book,payment,expected", [
+    ("12", None, None, None, False),                             # invalid patron ID
+    ("123456", None, None, None, False),                         # fee lookup fails
+    ("123456", {"fee_amount": 0}, None, None, False),            # zero fee
+    ("123456", {"fee_amount": 5}, None, None, False),            # book not found
+    ("123456", {"fee_amount": 5}, {"title": "Book"},
+     (True, "txn1", "OK"), True),                                # payment success
+    ("123456", {"fee_amount": 5}, {"title": "Book"},
+     (False, None, "Nope"), False),                              # payment declined
+    ("123456", {"fee_amount": 5}, {"title": "Book"},
+     Exception("Err"), False),                                   # gateway raises
+], ids=["invalid_patron", "fee_lookup_fails", "zero_fee", "book_not_found",
+        "payment_success", "payment_declined", "gateway_exception"])
+def test_pay_late_fees_paths(mocker, pg, patron, fee, book, payment, expected):
+    mocker.patch.object(library_service, "calculate_late_fee_for_book",
+                 return_value=fee)
+    mocker.patch.object(library_service, "get_book_by_id", return_value=book)
+    if isinstance(payment, Exception):
+        pg.process_payment.side_effect = payment
+    else:
+        pg.process_payment.return_value = payment
+    assert pay_late_fees(patron, 1, pg)[0] is expected
 
 # -------------------------------------------------------------
 # Statement Coverage Tests for refund_late_fee_payment
-def test_refund_late_fee_payment_all_paths():
-    pg = Mock(spec=PaymentGateway)
-    # invalid ID
-    assert refund_late_fee_payment("bad", 5, pg)[0] is False
-    # invalid amount 
-    assert refund_late_fee_payment("txn_1", 0, pg)[0] is False
-    # exceeds max
-    assert refund_late_fee_payment("txn_1", 20, pg)[0] is False
-    # success
-    pg.refund_payment.return_value = (True, "OK")
-    assert refund_late_fee_payment("txn_1", 5, pg)[0] is True
-    # fail
-    pg.refund_payment.return_value = (False, "Bad")
-    assert refund_late_fee_payment("txn_1", 5, pg)[0] is False
-    # exception
-    pg.refund_payment.side_effect = Exception("Oops")
-    assert refund_late_fee_payment("txn_1", 5, pg)[0] is False
-
-def test_process_payment_invalid_amount_zero():
-    gateway = PaymentGateway()
-    success, txn, msg = gateway.process_payment("123456", 0, "test")
-    assert success is False
-    assert "Invalid amount" in msg
-
-def test_process_payment_invalid_amount_negative():
-    gateway = PaymentGateway()
-    success, txn, msg = gateway.process_payment("123456", -10, "test")
-    assert success is False
-    assert "Invalid amount" in msg
-
-def test_process_payment_amount_exceeds_limit():
-    gateway = PaymentGateway()
-    success, txn, msg = gateway.process_payment("123456", 2000, "test")
-    assert success is False
-    assert "exceeds limit" in msg
-
-def test_process_payment_invalid_patron_id_format():
-    gateway = PaymentGateway()
-    success, txn, msg = gateway.process_payment("12345", 10, "test")
-    assert success is False
-    assert "Invalid patron ID" in msg
-
-def test_process_payment_success():
-    gateway = PaymentGateway()
-    success, txn, msg = gateway.process_payment("123456", 25.5, "test")
-    assert success is True
-    assert txn.startswith("txn_")
-    assert "processed successfully" in msg.lower()
+
+@pytest.mark.parametrize("txn,amount,refund,expected", [
+    ("bad", 5, None, False),                  # invalid transaction ID
+    ("txn_1", 0, None, False),                # invalid amount
+    ("txn_1", 20, None, False),               # exceeds max refund
+    ("txn_1", 5, (True, "OK"), True),         # refund success
+    ("txn_1", 5, (False, "Bad"), False),      # refund declined
+    ("txn_1", 5, Exception("Oops"), False),   # gateway raises
+], ids=["invalid_txn", "zero_amount", "over_max", "refund_success",
+        "refund_declined", "gateway_exception"])
+def test_refund_late_fee_payment_paths(pg, txn, amount, refund, expected):
+    if isinstance(refund, Exception):
+        pg.refund_payment.side_effect = refund
+    else:
+        pg.refund_payment.return_value = refund
+    assert refund_late_fee_payment(txn, amount, pg)[0] is expected
+
+# The gateway is stateless, so one instance serves every real-call test
+# in this module instead of eleven separate constructions.
+@pytest.fixture(scope="module")
+def gateway():
+    return PaymentGateway()
+
+@pytest.mark.parametrize("patron,amount,ok,substr", [
+    ("123456", 0, False, "Invalid amount"),
+    ("123456", -10, False, "Invalid amount"),
+    ("123456", 2000, False, "exceeds limit"),
+    ("12345", 10, False, "Invalid patron ID"),
+    ("123456", 25.5, True, "processed successfully"),
+], ids=["zero_amount", "negative_amount", "over_limit", "bad_patron_id", "success"])
+def test_process_payment_paths(gateway, patron, amount, ok, substr):
+    success, txn, msg = gateway.process_payment(patron, amount, "test")
+    assert success is ok
+    assert substr in msg
+    if ok:
+        assert txn.startswith("txn_")
 
 # -------------------------------------------------------------
 # Statement Coverage Tests for refund_payment
 
-def test_refund_payment_invalid_transaction_id_empty():
-    gateway = PaymentGateway()
-    success, msg = gateway.refund_payment("", 5)
-    assert success is False
-    assert "Invalid transaction ID" in msg
-
-def test_refund_payment_invalid_transaction_id_bad_format():
-    gateway = PaymentGateway()
-    success, msg = gateway.refund_payment("abc123", 5)
-    assert success is False
-    assert "Invalid transaction ID" in msg
-
-def test_refund_payment_invalid_refund_amount_zero():
-    gateway = PaymentGateway()
-    success, msg = gateway.refund_payment("txn_123456_1", 0)
-    assert success is False
-    assert "Invalid refund amount" in msg
-
-def test_refund_payment_invalid_refund_amount_negative():
-    gateway = PaymentGateway()
-    success, msg = gateway.refund_payment("txn_123456_1", -5)
-    assert success is False
-    assert "Invalid refund amount" in msg
-
-def test_refund_payment_success():
-    gateway = PaymentGateway()
-    success, msg = gateway.refund_payment("txn_123456_1", 10.0)
-    assert success is True
-    assert "processed successfully" in msg
+@pytest.mark.parametrize("txn,amount,ok,substr", [
+    ("", 5, False, "Invalid transaction ID"),
+    ("abc123", 5, False, "Invalid transaction ID"),
+    ("txn_123456_1", 0, False, "Invalid refund amount"),
+    ("txn_123456_1", -5, False, "Invalid refund amount"),
+    ("txn_123456_1", 10.0, True, "processed successfully"),
+], ids=["empty_txn", "bad_txn_format", "zero_amount", "negative_amount", "success"])
+def test_refund_payment_paths(gateway, txn, amount, ok, substr):
+    success, msg = gateway.refund_payment(txn, amount)
+    assert success is ok
+    assert substr in msg
 
 # -------------------------------------------------------------
 # Statement Coverage Tests for verify_payment_status
-def test_verify_payment_status_invalid_id():
-    gateway = PaymentGateway()
-    result = gateway.verify_payment_status("bad_id")
-    assert result["status"] == "not_found"
-
-def test_verify_payment_status_success():
-    gateway = PaymentGateway()
-    result = gateway.verify_payment_status("txn_123456_1")
-    assert result["status"] == "completed"
-    assert result["transaction_id"] == "txn_123456_1"
\ No newline at end of file
+
+@pytest.mark.parametrize("txn,status", [
+    ("bad_id", "not_found"),
+    ("txn_123456_1", "completed"),
+], ids=["invalid_id", "success"])
+def test_verify_payment_status_paths(gateway, txn, status):
+    result = gateway.verify_payment_status(txn)
+    assert result["status"] == status
+    if status == "completed":
+        assert result["transaction_id"] == txn
\ No newline at end of file
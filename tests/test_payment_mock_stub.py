@@ -1,263 +1,122 @@
-import os
 import pytest
-from datetime import datetime, timedelta
-from unittest.mock import Mock
-
-from services.library_service import (
-    add_book_to_catalog, 
-    borrow_book_by_patron,
-    return_book_by_patron,
-    calculate_late_fee_for_book,
-    search_books_in_catalog,
-    get_patron_status_report,
-    pay_late_fees, 
-    refund_late_fee_payment
-)
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
+from services.library_service import pay_late_fees, refund_late_fee_payment
 from services.payment_services import PaymentGateway
 
-from database import get_book_by_isbn, update_borrow_record_return_date, get_patron_borrowing_history
 # Stubbing technique: replaces dependency that returns fixed data 
 # Mocking technique: simulates a collaborator whose interactions you want to verify 
 
 
 # Unit tests for pay_late_fees(patron_id, book_id, payment_gateway)
-#--------------- Stub technique ------------------------------------
-def test_pay_late_fees_success_stub(mocker):
-    # stub late fee calculation
-    mocker.patch(
-        "services.library_service.calculate_late_fee_for_book",
-        return_value={"fee_amount": 5.00, "days_overdue": 2, "status": "Fee amount successfully calculated."}
-    )
-    mocker.patch(
-        "services.library_service.get_book_by_id",
-        return_value={"id": 10, "title": "Mock Book"}
-    )
-    # mock payment gateway collaborator
-    mock_gateway = Mock()
-    mock_gateway.process_payment.return_value = (True, "txn_123", "Paid successfully")
-    # call function
-    success, message, txn = pay_late_fees("123456", 10, mock_gateway)
-    assert success is True
-    assert "Paid successfully" in message
-    # verify interaction with mock collaborator
-    mock_gateway.process_payment.assert_called_once()
-
-def test_pay_late_fees_declined_by_gateway_stub(mocker):
-    # stub fee calculation
-    mocker.patch(
-        "services.library_service.calculate_late_fee_for_book",
-        return_value={"fee_amount": 8.00, "days_overdue": 4, "status": "Fee amount successfully calculated."}
-    )
-    mocker.patch("services.library_service.get_book_by_id",
-                 return_value={"id": 20, "title": "Decline Book"})
-    # mock gateway decline
-    mock_gateway = Mock()
-    mock_gateway.process_payment.return_value = (False, "", "Payment declined")
-    success, message, txn = pay_late_fees("222222", 20, mock_gateway)
-    assert success is False
-    assert "declined" in message.lower()
-    mock_gateway.process_payment.assert_called_once()
-
-def test_pay_late_fees_invalid_patron_id_stub(mocker):
-    # verify mock NOT called
-    # stub but should not be used
-    stub_fee = mocker.patch(
-        "services.library_service.calculate_late_fee_for_book",
-        return_value={"fee_amount": 5, "days_overdue": 1, "status": "Fee amount successfully calculated."}
-    )
-    mock_gateway = Mock()
-    success, message, txn = pay_late_fees("abc123", 10, mock_gateway)
-    assert success is False
-    assert "Invalid patron ID" in message
-    # verify no interactions
-    stub_fee.assert_not_called()
-    mock_gateway.process_payment.assert_not_called()
-
-def test_pay_late_fees_zero_late_fees_stub(mocker):
-    # verify mock NOT called
-    mocker.patch(
-        "services.library_service.calculate_late_fee_for_book",
-        return_value={"fee_amount": 0, "days_overdue": 0, "status": "Book is not overdue."}
-    )
-    mocker.patch("services.library_service.get_book_by_id",
-                 return_value={"id": 30, "title": "Zero Fee Book"})
-    mock_gateway = Mock()
-    success, message, txn = pay_late_fees("333333", 30, mock_gateway)
-    assert success is False
-    assert "no late fees" in message.lower()
-    # verify no payment attempted
-    mock_gateway.process_payment.assert_not_called()
-
-def test_pay_late_fees_network_error_stub(mocker):
-    # normal fee
-    mocker.patch(
-        "services.library_service.calculate_late_fee_for_book",
-        return_value={"fee_amount": 4.25, "days_overdue": 3, "status": "Fee amount successfully calculated."}
-    )
-    mocker.patch("services.library_service.get_book_by_id",
-                 return_value={"id": 40, "title": "Network Book"})
-    mock_gateway = Mock()
-    mock_gateway.process_payment.side_effect = Exception("Network down")
-    success, message, txn = pay_late_fees("444444", 40, mock_gateway)
-    assert success is False
-    assert "network down" in message.lower()
-    mock_gateway.process_payment.assert_called_once()
-
-#--------------- Mocking technique ------------------------------------
-def test_pay_late_fees_success_mock(mocker):
-    # stub fee calculation (only return value needed)
-    mocker.patch(
-        "services.library_service.calculate_late_fee_for_book",
-        return_value={"fee_amount": 7.50, "days_overdue": 5, "status": "Fee OK"}
-    )
-    mocker.patch(
-        "services.library_service.get_book_by_id",
-        return_value={"id": 10, "title": "Mock Book Title"}
-    )
-    # mock payment gateway with strict method spec
-    mock_gateway = Mock(spec=PaymentGateway)
-    mock_gateway.process_payment.return_value = (True, "txn_111", "Success")
-    success, message, txn = pay_late_fees("123456", 10, mock_gateway)
-    assert success is True
-    assert "Success" in message
-    mock_gateway.process_payment.assert_called_once()
-
-
-def test_pay_late_fees_declined_mock(mocker):
-    mocker.patch(
-        "services.library_service.calculate_late_fee_for_book",
-        return_value={"fee_amount": 4.00, "days_overdue": 2, "status": "Fee OK"}
-    )
-    mocker.patch(
-        "services.library_service.get_book_by_id",
-        return_value={"id": 20, "title": "Declined Book"}
-    )
-    mock_gateway = Mock(spec=PaymentGateway)
-    mock_gateway.process_payment.return_value = (False, "", "Declined by bank")
-    success, message, txn = pay_late_fees("222222", 20, mock_gateway)
-    assert success is False
-    assert "declined" in message.lower()
-    mock_gateway.process_payment.assert_called_once()
-
-
-def test_pay_late_fees_invalid_patron_id_mock(mocker):
-    mocker.patch(
-        "services.library_service.calculate_late_fee_for_book",
-        return_value={"fee_amount": 3.00, "days_overdue": 1, "status": "Fee OK"}
-    )
-    mock_gateway = Mock(spec=PaymentGateway)
-    success, message, txn = pay_late_fees("1234", 99, mock_gateway)
-    assert success is False
-    assert "Invalid patron ID" in message
-    mock_gateway.process_payment.assert_not_called()
-
-def test_pay_late_fees_zero_fee_mock(mocker):
-    mocker.patch(
-        "services.library_service.calculate_late_fee_for_book",
-        return_value={"fee_amount": 0, "days_overdue": 0, "status": "Not overdue"}
-    )
-    mocker.patch(
-        "services.library_service.get_book_by_id",
-        return_value={"id": 30, "title": "No Fee Book"}
-    )
-    mock_gateway = Mock(spec=PaymentGateway)
-    success, message, txn = pay_late_fees("999999", 30, mock_gateway)
-    assert success is False
-    assert "no late fees" in message.lower()
-    mock_gateway.process_payment.assert_not_called()
-
-def test_pay_late_fees_gateway_exception_mock(mocker):
-    mocker.patch(
-        "services.library_service.calculate_late_fee_for_book",
-        return_value={"fee_amount": 5.00, "days_overdue": 3, "status": "Fee OK"}
-    )
-    mocker.patch(
-        "services.library_service.get_book_by_id",
-        return_value={"id": 77, "title": "Network Book"}
-    )
-    mock_gateway = Mock(spec=PaymentGateway)
-    mock_gateway.process_payment.side_effect = Exception("Network error")
-    success, message, txn = pay_late_fees("777777", 77, mock_gateway)
-    assert success is False
-    assert "network error" in message.lower()
 
-    mock_gateway.process_payment.assert_called_once()
+# One table drives both techniques: (patron_id, stubbed fee result,
+# gateway behaviour — a return tuple or an exception to raise, expected
+# success, expected message substring, whether the gateway must have been
+# called, whether the fee stub must have been called).
+PAY_CASES = [
+    ("123456",
+     {"fee_amount": 5.00, "days_overdue": 2, "status": "Fee amount successfully calculated."},
+     (True, "txn_123", "Paid successfully"), True, "paid successfully", True, True),
+    ("222222",
+     {"fee_amount": 8.00, "days_overdue": 4, "status": "Fee amount successfully calculated."},
+     (False, "", "Payment declined"), False, "declined", True, True),
+    ("abc123",
+     {"fee_amount": 5, "days_overdue": 1, "status": "Fee amount successfully calculated."},
+     None, False, "invalid patron id", False, False),
+    ("333333",
+     {"fee_amount": 0, "days_overdue": 0, "status": "Book is not overdue."},
+     None, False, "no late fees", False, True),
+    ("444444",
+     {"fee_amount": 4.25, "days_overdue": 3, "status": "Fee amount successfully calculated."},
+     Exception("Network down"), False, "network down", True, True),
+]
+PAY_IDS = ["success", "declined", "invalid_patron", "zero_fee", "gateway_exception"]
+
+# Spec introspection of PaymentGateway happens once at import; the
+# fixture hands the same mock back with calls and configured behaviour
+# wiped, the same scheme the coverage test files use.
+_PG_MOCK = Mock(spec=PaymentGateway)
+
+@pytest.fixture
+def spec_gateway():
+    _PG_MOCK.reset_mock(return_value=True, side_effect=True)
+    return _PG_MOCK
+
+# same reuse scheme for the stub technique's loose gateway double
+_STUB_MOCK = Mock()
+
+@pytest.fixture
+def stub_gateway():
+    _STUB_MOCK.reset_mock(return_value=True, side_effect=True)
+    return _STUB_MOCK
+
+@pytest.fixture
+def lib_patches():
+    """Patch both library_service collaborators in one place; tests set
+    return values on the yielded mocks instead of re-installing patches."""
+    with patch("services.library_service.calculate_late_fee_for_book") as fee, \
+         patch("services.library_service.get_book_by_id") as book:
+        yield SimpleNamespace(fee=fee, book=book)
+
+# The technique axis keeps both doubles covered in one body: "stub" uses
+# a loose Mock that stands in without enforcing the gateway's interface,
+# "mock" uses a strict method spec that only allows real PaymentGateway
+# attributes.
+@pytest.mark.parametrize("technique", ["stub", "mock"])
+@pytest.mark.parametrize("pid,fee,payment,ok,sub,gateway_called,fee_called",
+                         PAY_CASES, ids=PAY_IDS)
+def test_pay_late_fees(lib_patches, stub_gateway, spec_gateway, technique,
+                       pid, fee, payment, ok, sub, gateway_called, fee_called):
+    gateway = stub_gateway if technique == "stub" else spec_gateway
+    lib_patches.fee.return_value = fee
+    lib_patches.book.return_value = {"id": 10, "title": "Mock Book"}
+    if isinstance(payment, Exception):
+        gateway.process_payment.side_effect = payment
+    elif payment is not None:
+        gateway.process_payment.return_value = payment
+    success, message, txn = pay_late_fees(pid, 10, gateway)
+    assert success is ok
+    assert sub in message.lower()
+    # verify interactions with the collaborators
+    if gateway_called:
+        gateway.process_payment.assert_called_once()
+    else:
+        gateway.process_payment.assert_not_called()
+    if not fee_called:
+        lib_patches.fee.assert_not_called()
 
 #-----------------------------------------------------------------------------------------------------------------------
 
 # Unit tests for refund_late_fee_payment(transaction_id, amount, payment_gateway)
 
-#--------------- Stub technique ------------------------------------
-def test_refund_late_fee_payment_success_stub(mocker):
-    mock_gateway = Mock()
-    mock_gateway.refund_payment.return_value = (True, "Refund processed")
-    success, message = refund_late_fee_payment("txn_123456_111", 5.00, mock_gateway)
-    assert success is True
-    assert "processed" in message.lower()
-    mock_gateway.refund_payment.assert_called_once_with("txn_123456_111", 5.00)
-
-def test_refund_late_fee_payment_invalid_transaction_id_stub(mocker):
-    mock_gateway = Mock()
-    success, message = refund_late_fee_payment("bad_id", 5.00, mock_gateway)
-    assert success is False
-    assert "invalid transaction id" in message.lower()
-    mock_gateway.refund_payment.assert_not_called()
-
-def test_refund_late_fee_payment_invalid_refund_amounts_stub(mocker):
-    mock_gateway = Mock()
-    # negative amount
-    success1, msg1 = refund_late_fee_payment("txn_123456_222", -5, mock_gateway)
-    assert success1 is False
-    assert "refund amount must be greater than 0" in msg1.lower()
-    # zero amount
-    success2, msg2 = refund_late_fee_payment("txn_123456_222", 0, mock_gateway)
-    assert success2 is False
-    assert "refund amount must be greater than 0" in msg2.lower()
-    # exceeds $15 cap (based on your late fee max)
-    success3, msg3 = refund_late_fee_payment("txn_123456_222", 20, mock_gateway)
-    assert success3 is False
-    assert "exceeds" in msg3.lower()
-    mock_gateway.refund_payment.assert_not_called()
-
-#--------------- Mocking technique ------------------------------------
-
-def test_refund_late_fee_payment_success_mock():
-    mock_gateway = Mock(spec=PaymentGateway)
-    mock_gateway.refund_payment.return_value = (True, "Refund complete")
-    success, message = refund_late_fee_payment("txn_123456_01", 5.00, mock_gateway)
-    assert success is True
-    assert "refund complete" in message.lower()
-    mock_gateway.refund_payment.assert_called_once_with("txn_123456_01", 5.00)
-
-
-def test_refund_late_fee_payment_invalid_transaction_id_mock():
-    mock_gateway = Mock(spec=PaymentGateway)
-    success, message = refund_late_fee_payment("bad_id", 5.00, mock_gateway)
-    assert success is False
-    assert "invalid transaction" in message.lower()
-    mock_gateway.refund_payment.assert_not_called()
-
-
-def test_refund_late_fee_payment_negative_amount_mock():
-    mock_gateway = Mock(spec=PaymentGateway)
-    success, message = refund_late_fee_payment("txn_44444_22", -5.0, mock_gateway)
-    assert success is False
-    assert "refund amount must be greater than 0" in message.lower()
-    mock_gateway.refund_payment.assert_not_called()
-
-
-def test_refund_late_fee_payment_zero_amount_mock():
-    mock_gateway = Mock(spec=PaymentGateway)
-    success, message = refund_late_fee_payment("txn_99999_33", 0, mock_gateway)
-    assert success is False
-    assert "refund amount must be greater than 0" in message.lower()
-    mock_gateway.refund_payment.assert_not_called()
-
-
-def test_refund_late_fee_payment_exceeds_max_fee_cap_mock():
-    mock_gateway = Mock(spec=PaymentGateway)
-    success, message = refund_late_fee_payment("txn_123000_01", 20.00, mock_gateway)
-    assert success is False
-    assert "exceeds" in message.lower()
-    mock_gateway.refund_payment.assert_not_called()
\ No newline at end of file
+# (transaction id, amount, gateway refund return (None when the gateway
+# must not be reached), expected success, expected message substring,
+# whether the gateway must have been called)
+REFUND_CASES = [
+    ("txn_123456_111", 5.00, (True, "Refund processed"), True, "processed", True),
+    ("bad_id", 5.00, None, False, "invalid transaction", False),
+    ("txn_123456_222", -5, None, False, "refund amount must be greater than 0", False),
+    ("txn_123456_222", 0, None, False, "refund amount must be greater than 0", False),
+    # exceeds $15 cap (based on the late fee max)
+    ("txn_123456_222", 20.00, None, False, "exceeds", False),
+]
+REFUND_IDS = ["success", "invalid_txn", "negative_amount", "zero_amount",
+              "exceeds_max_fee_cap"]
+
+@pytest.mark.parametrize("technique", ["stub", "mock"])
+@pytest.mark.parametrize("txn,amount,refund,ok,sub,gateway_called",
+                         REFUND_CASES, ids=REFUND_IDS)
+def test_refund_late_fee_payment(stub_gateway, spec_gateway, technique,
+                                 txn, amount, refund, ok, sub, gateway_called):
+    gateway = stub_gateway if technique == "stub" else spec_gateway
+    if refund is not None:
+        gateway.refund_payment.return_value = refund
+    success, message = refund_late_fee_payment(txn, amount, gateway)
+    assert success is ok
+    assert sub in message.lower()
+    if gateway_called:
+        gateway.refund_payment.assert_called_once_with(txn, amount)
+    else:
+        gateway.refund_payment.assert_not_called()
\ No newline at end of file